@@ -12,6 +12,15 @@ Created on Sat Nov 20 2021
 # %% Data loading
 
 
+import math
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -65,30 +74,191 @@ def load_data(quiet=True):
 # %% Part 1
 
 
+def twoSum(data, target):
+    seen = set()
+    for num in data:
+        if target - num in seen:
+            return (target - num, num)
+        seen.add(num)
+    return None
+
+
+def kSum(data, target=2020, k=2):
+    """
+    Finds k entries of data that sum to target, returning them as a tuple
+    (or None if no such entries exist). Uses a hash set for k=2, and
+    sort + two-pointer for k>=3, stopping as soon as a match is found.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1, got {}".format(k))
+    if k == 1:
+        return (target,) if target in data else None
+    if k == 2:
+        return twoSum(data, target)
+
+    return sortedKSum(sorted(data), target, k)
+
+
+def sortedKSum(nums, target, k):
+    """
+    kSum for k>=2 over an already sorted list, so callers that query the
+    same data repeatedly only pay for the sort once.
+    """
+    def search(start, target, k):
+        if k == 2:
+            lo, hi = start, len(nums) - 1
+            while lo < hi:
+                total = nums[lo] + nums[hi]
+                if total == target:
+                    return (nums[lo], nums[hi])
+                elif total < target:
+                    lo += 1
+                else:
+                    hi -= 1
+            return None
+        for i in range(start, len(nums) - k + 1):
+            # Skip duplicate values, they lead to the same sub-search
+            if i > start and nums[i] == nums[i - 1]:
+                continue
+            # Remaining k-1 entries are all >= nums[i], so sums only grow from here
+            if nums[i] * k > target:
+                break
+            # Even the largest k-1 entries can't make up the difference
+            if nums[i] + sum(nums[len(nums) - k + 1:]) < target:
+                continue
+            rest = search(i + 1, target - nums[i], k - 1)
+            if rest:
+                return (nums[i],) + rest
+        return None
+
+    return search(0, target, k)
+
+# %% Batch queries
+
+
+class SumIndex:
+    """
+    Index over a fixed list of entries for answering pair/triple sum queries
+    against many targets. The sorted values (and a NumPy copy, if NumPy is
+    installed) are built once and shared by every query.
+    """
+
+    # Largest pair-sum table (in entries) we're willing to build for the pure
+    # Python pair lookup
+    PAIR_TABLE_LIMIT = 1 << 20
+    # Max number of cells in a (targets x entries) NumPy block
+    BLOCK_SIZE = 1 << 22
+
+    def __init__(self, data):
+        self.nums = sorted(data)
+        self.counts = Counter(self.nums)
+        self.arr = np.array(self.nums, dtype=np.int64) if np else None
+        self._pairTable = None
+
+    def pairs(self, targets):
+        """
+        Returns a dict mapping each target to a pair of entries summing to it,
+        or None if there is no such pair
+        """
+        targets = list(dict.fromkeys(targets))
+        if self.arr is not None:
+            return self._pairsNumpy(targets)
+        if len(self.counts) ** 2 <= self.PAIR_TABLE_LIMIT:
+            table = self._buildPairTable()
+            return {t: table.get(t) for t in targets}
+        return {t: self._pairLookup(t) for t in targets}
+
+    def triples(self, targets):
+        """
+        Returns a dict mapping each target to a triple of entries summing to it,
+        or None if there is no such triple
+        """
+        targets = list(dict.fromkeys(targets))
+        if self.arr is not None:
+            return self._triplesNumpy(targets)
+        return {t: sortedKSum(self.nums, t, 3) for t in targets}
+
+    def _buildPairTable(self):
+        if self._pairTable is None:
+            table = {}
+            values = sorted(self.counts)
+            for i, a in enumerate(values):
+                if self.counts[a] > 1:
+                    table.setdefault(2 * a, (a, a))
+                for b in values[i + 1:]:
+                    table.setdefault(a + b, (a, b))
+            self._pairTable = table
+        return self._pairTable
+
+    def _pairLookup(self, target):
+        for a in self.counts:
+            b = target - a
+            if b in self.counts and (b != a or self.counts[a] > 1):
+                return (min(a, b), max(a, b))
+        return None
+
+    def _pairsNumpy(self, targets):
+        arr = self.arr
+        n = len(arr)
+        result = dict.fromkeys(targets)
+        if n < 2 or not targets:
+            return result
+        step = max(1, self.BLOCK_SIZE // n)
+        for start in range(0, len(targets), step):
+            block = np.array(targets[start:start + step], dtype=np.int64)
+            # cand[t, j] is the value that must pair with arr[j] to make block[t]
+            cand = block[:, None] - arr[None, :]
+            left = np.searchsorted(arr, cand, side="left")
+            right = np.searchsorted(arr, cand, side="right")
+            # An entry can only pair with itself if it appears more than once
+            found = (right - left - (cand == arr[None, :])) > 0
+            hit = found.any(axis=1)
+            first = found.argmax(axis=1)
+            for t, ok, j in zip(block.tolist(), hit.tolist(), first.tolist()):
+                if ok:
+                    a, b = self.nums[j], t - self.nums[j]
+                    result[t] = (min(a, b), max(a, b))
+        return result
+
+    def _triplesNumpy(self, targets):
+        arr = self.arr
+        n = len(arr)
+        result = dict.fromkeys(targets)
+        pending = np.array(targets, dtype=np.int64)
+        for i in range(n - 2):
+            if not len(pending):
+                break
+            rest = arr[i + 1:]
+            step = max(1, self.BLOCK_SIZE // len(rest))
+            solved = np.zeros(len(pending), dtype=bool)
+            for start in range(0, len(pending), step):
+                block = pending[start:start + step]
+                # Search for arr[j] + arr[k] == block - arr[i] with i < j < k
+                cand = (block - arr[i])[:, None] - rest[None, :]
+                k = np.searchsorted(arr, cand, side="right") - 1
+                j = np.arange(i + 1, n)[None, :]
+                found = (k > j) & (arr[np.maximum(k, 0)] == cand)
+                hit = found.any(axis=1)
+                first = found.argmax(axis=1)
+                for row in np.flatnonzero(hit).tolist():
+                    jj = i + 1 + int(first[row])
+                    a, b = self.nums[i], self.nums[jj]
+                    result[int(block[row])] = (a, b, int(block[row]) - a - b)
+                solved[start:start + step] = hit
+            pending = pending[~solved]
+        return result
+
+
 def part1(data):
-    answer1 = 0
-    for i in range(len(data)):
-        num1 = data[i]
-        for j in range(i + 1, len(data)):
-            num2 = data[j]
-            if (num1 + num2 == 2020):
-                answer1 = num1 * num2
-    return answer1
+    match = kSum(data, 2020, 2)
+    return math.prod(match) if match else 0
 
 # %% Part 2
 
 
 def part2(data):
-    answer2 = 0
-    for i in range(len(data)):
-        num1 = data[i]
-        for j in range(i + 1, len(data)):
-            num2 = data[j]
-            for k in range(j + 1, len(data)):
-                num3 = data[k]
-                if (num1 + num2 + num3 == 2020):
-                    answer2 = num1 * num2 * num3
-    return answer2
+    match = kSum(data, 2020, 3)
+    return math.prod(match) if match else 0
 
 
 # %% Run all
@@ -11,6 +11,12 @@ Created on 2021-11-22T21:40:49.216512
 # %% Data loading
 
 
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -53,53 +59,84 @@ def find_path_to_helpers(target_folder="helpers", quiet=False):
 def load_data(quiet=True):
     find_path_to_helpers(quiet=quiet)
     if __package__:
-        from ..helpers import get_input_lines
+        from ..helpers import get_input
     else:
-        from helpers import get_input_lines
+        from helpers import get_input
 
-    data = get_input_lines()
+    data = get_input()
 
     return data
 
 # %% Part 1
 
+POLICY_REGEX = re.compile(r"(\d+)-(\d+) (\w): (\w+)")
+
+
+def scanPolicies(text: str) -> Tuple[int, int]:
+    """
+    Checks every password in text against both policies in a single pass,
+    returning (valid under count policy, valid under position policy)
+    """
+    correct1 = correct2 = 0
+    for match in POLICY_REGEX.finditer(text):
+        low, high, letter, password = match.groups()
+        low, high = int(low), int(high)
+        if low <= password.count(letter) <= high:
+            correct1 += 1
+        if (password[low - 1:low] == letter) != (password[high - 1:high] == letter):
+            correct2 += 1
+    return correct1, correct2
+
+
+def scanRange(path: str, start: int, end: int) -> Tuple[int, int]:
+    """Scans the lines of a file that start within the byte range [start, end)"""
+    with open(path, "rb") as f:
+        if start:
+            # Skip the partial line, it belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        if pos >= end:
+            return 0, 0
+        text = f.read(end - pos)
+        # Finish off the last line, unless the range ends on a line break
+        if not text.endswith(b"\n"):
+            text += f.readline()
+    return scanPolicies(text.decode())
+
+
+def scanFile(path: str, workers: int = None, chunkSize: int = 1 << 24) -> Tuple[int, int]:
+    """
+    Scans a (large) file by splitting it into byte ranges of about chunkSize
+    and processing them in a process pool, summing the results
+    """
+    size = os.path.getsize(path)
+    starts = range(0, size, chunkSize)
+    if len(starts) <= 1:
+        return scanRange(path, 0, size)
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(scanRange, [path] * len(starts), starts,
+                           [min(start + chunkSize, size) for start in starts])
+        counts = list(results)
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
 
 def part1(data):
-    correct = 0
-    for line in data:
-        items = line.split(" ")
-        bounds = items[0].split("-")
-        minCount = int(bounds[0])
-        maxCount = int(bounds[1])
-        letter = items[1][0]
-        password = items[2]
-        count = password.count(letter)
-        if (minCount <= count <= maxCount):
-            correct += 1
-    return correct
+    return scanPolicies(data)[0]
 
 # %% Part 2
 
 
 def part2(data):
-    correct = 0
-    for line in data:
-        items = line.split(" ")
-        bounds = items[0].split("-")
-        pos1 = int(bounds[0]) - 1
-        pos2 = int(bounds[1]) - 1
-        letter = items[1][0]
-        password = items[2]
-        if ((password[pos1] == letter and password[pos2] != letter) or (password[pos1] != letter and password[pos2] == letter)):
-            correct += 1
-    return correct
+    return scanPolicies(data)[1]
 
 
 # %% Run all
 if __name__ == "__main__":
     data = load_data()
+    result1, result2 = scanPolicies(data)
 
-    print(part1(data))
-    print(part2(data))
+    print(result1)
+    print(result2)
 
 # %%
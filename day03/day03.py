@@ -11,6 +11,10 @@ Created on 2021-11-22T21:40:53.639678
 # %% Data loading
 
 
+import math
+from typing import Iterable, List, Sequence, Tuple
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -50,12 +54,16 @@ def find_path_to_helpers(target_folder="helpers", quiet=False):
                 "Can't find '{}' directory!".format(target_folder))
 
 
-def load_data(quiet=True):
+def load_data(quiet=True, stream=False):
     find_path_to_helpers(quiet=quiet)
     if __package__:
-        from ..helpers import get_input_lines
+        from ..helpers import get_input_lines, get_input_lines_iter
     else:
-        from helpers import get_input_lines
+        from helpers import get_input_lines, get_input_lines_iter
+
+    # Streamed rows are read lazily, so only one row is in memory at a time
+    if stream:
+        return get_input_lines_iter()
 
     data = get_input_lines()
 
@@ -64,41 +72,54 @@ def load_data(quiet=True):
 # %% Part 1
 
 
+def countTrees(rows: Iterable[str], slopes: Sequence[Tuple[int, int]]) -> List[int]:
+    """
+    Counts the trees hit on each (right, down) slope, walking every slope
+    together in a single pass over the rows
+    """
+    counts = [0] * len(slopes)
+    # Group slopes by their down step, so each row only checks the slopes
+    # that actually land on it
+    byDown = {}
+    for i, (right, down) in enumerate(slopes):
+        if down < 1:
+            raise ValueError("Slopes must move down, got {}".format((right, down)))
+        byDown.setdefault(down, []).append((i, right))
+    for y, row in enumerate(rows):
+        # The starting square on the top row doesn't count
+        if not y or not row:
+            continue
+        width = len(row)
+        for down, group in byDown.items():
+            if y % down:
+                continue
+            step = y // down
+            for i, right in group:
+                if row[step * right % width] == "#":
+                    counts[i] += 1
+    return counts
+
+
+def evaluateSlopes(rows: Iterable[str], slopes: Sequence[Tuple[int, int]]) -> Tuple[List[int], int]:
+    """Tree counts for every slope, along with their product"""
+    counts = countTrees(rows, slopes)
+    return counts, math.prod(counts)
+
+
 def part1(data):
-    count = 0
-    xPos = 0
-    for i in range(1, len(data)):
-        row = data[i]
-        xPos += 3
-        if row[xPos % len(row)] == "#":
-            count += 1
-    return count
+    return countTrees(data, [(3, 1)])[0]
 
 # %% Part 2
 
 
 def part2(data):
-    slopes = [1, 3, 5, 7]
-    prod = 1
-    for slope in slopes:
-        count = 0
-        xPos = 0
-        for i in range(1, len(data)):
-            row = data[i]
-            xPos += slope
-            if row[xPos % len(row)] == "#":
-                count += 1
-        prod *= count
-    count = 0
-    xPos = 0
-    yPos = 0
-    for i in range(2, len(data), 2):
-        row = data[i]
-        xPos += 1
-        if row[xPos % len(row)] == "#":
-            count += 1
-    prod *= count
-    return prod
+    return evaluateSlopes(data, [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)])[1]
+
+
+def solveStream(rows: Iterable[str]) -> Tuple[int, int]:
+    """Both parts from a single pass over the rows, for streamed maps"""
+    counts, product = evaluateSlopes(rows, [(3, 1), (1, 1), (5, 1), (7, 1), (1, 2)])
+    return counts[0], product
 
 
 # %% Run all
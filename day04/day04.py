@@ -11,6 +11,10 @@ Created on 2021-11-22T21:40:56.153736
 # %% Data loading
 
 
+import re
+from typing import Callable, Dict, List, Optional
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -50,73 +54,134 @@ def find_path_to_helpers(target_folder="helpers", quiet=False):
                 "Can't find '{}' directory!".format(target_folder))
 
 
-def load_data(quiet=True):
+def load_data(quiet=True, stream=False):
     find_path_to_helpers(quiet=quiet)
     if __package__:
-        from ..helpers import get_input
+        from ..helpers import get_input_records
     else:
-        from helpers import get_input
+        from helpers import get_input_records
 
-    data = get_input().split("\n\n")
+    # Streamed records are read lazily, but can only be iterated once
+    if stream:
+        return get_input_records()
+
+    data = list(get_input_records())
 
     return data
 
 # %% Part 1
 
+FIELDS = ("byr", "iyr", "eyr", "hgt", "hcl", "ecl", "pid", "cid")
+REQUIRED = ("byr", "iyr", "eyr", "hgt", "hcl", "ecl", "pid")
+ENTRY_REGEX = re.compile(r"(\S+):(\S+)")
+# Binary digit bytes, for building mask bitsets with int(..., 2)
+ZERO, ONE = b"01"
+
+
+class PassportStore:
+    """
+    Passports stored column-wise: one list of values per field, with None
+    where a passport doesn't have that field
+    """
+
+    def __init__(self, columns: Dict[str, List[Optional[str]]], count: int):
+        self.columns = columns
+        self.count = count
+
+    @staticmethod
+    def fromBlocks(blocks: List[str]) -> "PassportStore":
+        columns = {}
+        count = 0
+        for block in blocks:
+            entries = dict(ENTRY_REGEX.findall(block))
+            for key, column in columns.items():
+                column.append(entries.pop(key, None))
+            # Any fields we haven't seen before get a new column
+            for key, val in entries.items():
+                columns[key] = [None] * count + [val]
+            count += 1
+        return PassportStore(columns, count)
+
+    def column(self, field: str) -> List[Optional[str]]:
+        return self.columns.get(field) or [None] * self.count
+
+    def mask(self, field: str, rule: Callable[[str], bool]) -> int:
+        """
+        Evaluates a rule over a whole column, returning a bitset (bit i for
+        passport i) of the passports that have the field and pass the rule
+        """
+        digits = bytearray(ONE if val is not None and rule(val) else ZERO
+                           for val in self.column(field))
+        # Passport 0 is the lowest bit, so it's the last binary digit
+        digits.reverse()
+        return int(digits or b"0", 2)
+
+    def select(self, mask: int) -> "PassportStore":
+        """A new store holding only the passports in mask"""
+        keep = [i for i, bit in enumerate(reversed(bin(mask)[2:])) if bit == "1"]
+        columns = {k: [col[i] for i in keep] for k, col in self.columns.items()}
+        return PassportStore(columns, len(keep))
+
+
+def allPassports(store: PassportStore) -> int:
+    return (1 << store.count) - 1
+
+
+def matchAll(store: PassportStore, rules: Dict[str, Callable[[str], bool]]) -> int:
+    """ANDs together the per-column masks for every rule"""
+    mask = allPassports(store)
+    for field, rule in rules.items():
+        mask &= store.mask(field, rule)
+    return mask
+
+
+def countMask(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def present(val: str) -> bool:
+    return True
+
 
 def part1(data):
-    keys = ["byr", "iyr", "eyr", "hgt", "hcl", "ecl", "pid", "cid"]
-    valid = 0
-    proper = []
-    for passport in data:
-        ppDict = {}
-        entries = []
-        for line in passport.split("\n"):
-            for item in line.split(" "):
-                (key, val) = item.split(":")
-                entries.append(key)
-                ppDict[key] = val
-        missing = [x for x in filter(lambda x: not x in entries, keys)]
-        if len(missing) == 0:
-            valid += 1
-            proper.append(ppDict)
-        elif len(missing) == 1 and missing[0] == "cid":
-            valid += 1
-            proper.append(ppDict)
-    return valid, proper
+    store = data if isinstance(data, PassportStore) else PassportStore.fromBlocks(data)
+    mask = matchAll(store, dict.fromkeys(REQUIRED, present))
+    return countMask(mask), store.select(mask)
 
 # %% Part 2
 
 
+def yearRule(low: int, high: int) -> Callable[[str], bool]:
+    regex = re.compile(r"\d{4}")
+    return lambda val: bool(regex.fullmatch(val)) and low <= int(val) <= high
+
+
+HGT_REGEX = re.compile(r"(\d+)(cm|in)")
+HGT_BOUNDS = {"cm": (150, 193), "in": (59, 76)}
+
+
+def heightRule(val: str) -> bool:
+    match = HGT_REGEX.fullmatch(val)
+    if not match:
+        return False
+    low, high = HGT_BOUNDS[match.group(2)]
+    return low <= int(match.group(1)) <= high
+
+
+RULES = {
+    "byr": yearRule(1920, 2002),
+    "iyr": yearRule(2010, 2020),
+    "eyr": yearRule(2020, 2030),
+    "hgt": heightRule,
+    "hcl": re.compile(r"#[0-9a-f]{6}").fullmatch,
+    "ecl": frozenset("amb blu brn gry grn hzl oth".split(" ")).__contains__,
+    "pid": re.compile(r"\d{9}").fullmatch,
+}
+
+
 def part2(data):
-    import re
-
-    valid = 0
-    for pp in proper:
-        if (not 1920 <= int(pp["byr"]) <= 2002):
-            continue
-        if (not 2010 <= int(pp["iyr"]) <= 2020):
-            continue
-        if (not 2020 <= int(pp["eyr"]) <= 2030):
-            continue
-        if re.match('([0-9])+(cm|in)', pp["hgt"]):
-            hgtUnit = pp["hgt"][len(pp["hgt"]) - 2:]
-            hgtVal = int(pp["hgt"][:len(pp["hgt"]) - 2])
-            if hgtUnit == "in" and not 59 <= hgtVal <= 76:
-                continue
-            elif hgtUnit == "cm" and not 150 <= hgtVal <= 193:
-                continue
-        else:
-            continue
-        if not re.match('#([0-9a-f]){6}', pp["hcl"]):
-            continue
-        validEcl = "amb blu brn gry grn hzl oth".split(" ")
-        if not pp["ecl"] in validEcl:
-            continue
-        if len(pp["pid"]) != 9 or not pp["pid"].isnumeric():
-            continue
-        valid += 1
-    return valid
+    store = data if isinstance(data, PassportStore) else PassportStore.fromBlocks(data)
+    return countMask(matchAll(store, RULES))
 
 
 # %% Run all
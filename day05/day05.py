@@ -63,45 +63,97 @@ def load_data(quiet=True):
 
 # %% Part 1
 
+# F/L pick the lower half and B/R the upper half, so a pass is just binary
+SEAT_BITS = str.maketrans("FBLR", "0101")
 
-def part1(data):
-    import math
-
-    ids = []
-    maxID = -1
-    for line in data:
-        rowLow = 0
-        rowHigh = 127
-        for c in line[:7]:
-            if (c == "F"):
-                rowHigh = math.floor((rowHigh + rowLow) / 2)
-            else:
-                rowLow = math.ceil((rowHigh + rowLow) / 2)
-        row = rowLow
-        seatLow = 0
-        seatHigh = 7
-        for c in line[7:10]:
-            if (c == "L"):
-                seatHigh = math.floor((seatHigh + seatLow) / 2)
-            else:
-                seatLow = math.ceil((seatHigh + seatLow) / 2)
-        seat = seatLow
-        seatID = row * 8 + seat
-        ids.append(seatID)
-        if (seatID > maxID):
-            maxID = seatID
-    return maxID, ids
+
+def checkGeometry(rows, cols):
+    """Validates plane geometry, returning the bits per pass (row + column)"""
+    for name, size in (("rows", rows), ("cols", cols)):
+        if size < 1 or size & (size - 1):
+            raise ValueError(
+                "Plane {} must be a power of two, got {}".format(name, size))
+    return (rows * cols).bit_length() - 1
+
+
+def decodeSeat(boardingPass, rows=128, cols=8):
+    """
+    Decodes a boarding pass to its seat ID (row * cols + col). With
+    power-of-two geometry that's the whole pass read as a binary number.
+    """
+    length = checkGeometry(rows, cols)
+    if len(boardingPass) != length:
+        raise ValueError("Boarding pass '{}' should be {} characters for a {}x{} plane".format(
+            boardingPass, length, rows, cols))
+    return int(boardingPass.translate(SEAT_BITS), 2)
+
+
+def part1(data, rows=128, cols=8):
+    ids = [decodeSeat(line, rows, cols) for line in data if line]
+    return max(ids, default=-1), ids
 
 # %% Part 2
 
 
-def part2(ids):
-    prevInIDs = False
-    for i in range(1, 1023):
-        if i in ids:
-            prevInIDs = True
-        elif i not in ids and prevInIDs:
-            return i
+def checkSeatID(seatID, rows=128, cols=8):
+    if not 0 <= seatID < rows * cols:
+        raise ValueError("Seat ID {} is outside a {}x{} plane".format(
+            seatID, rows, cols))
+
+
+def findFreeSeat(bitmap):
+    """First empty seat with both neighbours taken, or None"""
+    i = bitmap.find(b"\x01\x00\x01")
+    return i + 1 if i >= 0 else None
+
+
+class SeatTracker:
+    """
+    Incrementally tracks boarding passes as they arrive, keeping the highest
+    seat ID and the set of free seats with both neighbours taken up to date
+    on every pass, so queries never rescan what's been seen
+    """
+
+    def __init__(self, rows=128, cols=8):
+        checkGeometry(rows, cols)
+        self.rows = rows
+        self.cols = cols
+        self.bitmap = bytearray(rows * cols)
+        self.maxID = -1
+        self.gaps = set()
+
+    def add(self, boardingPass):
+        """Records a boarding pass, returning False if the seat was already taken"""
+        return self.addID(decodeSeat(boardingPass, self.rows, self.cols))
+
+    def addID(self, seatID):
+        bitmap = self.bitmap
+        checkSeatID(seatID, self.rows, self.cols)
+        if bitmap[seatID]:
+            return False
+        bitmap[seatID] = 1
+        self.maxID = max(self.maxID, seatID)
+        self.gaps.discard(seatID)
+        # Taking a seat can only close the gaps next to it on either side
+        for neighbour, beyond in ((seatID - 1, seatID - 2), (seatID + 1, seatID + 2)):
+            if 0 <= beyond < len(bitmap) and not bitmap[neighbour] and bitmap[beyond]:
+                self.gaps.add(neighbour)
+        return True
+
+    def highest(self):
+        return self.maxID
+
+    def freeSeats(self):
+        """Empty seats with both neighbours taken, in order"""
+        return sorted(self.gaps)
+
+
+def part2(ids, rows=128, cols=8):
+    bitmap = bytearray(rows * cols)
+    for i in ids:
+        checkSeatID(i, rows, cols)
+        bitmap[i] = 1
+    return findFreeSeat(bitmap)
 
 
 # %% Run all
@@ -11,6 +11,16 @@ Created on 2021-11-22T21:41:01.093932
 # %% Data loading
 
 
+from functools import reduce
+from operator import and_, or_
+from typing import Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -50,58 +60,85 @@ def find_path_to_helpers(target_folder="helpers", quiet=False):
                 "Can't find '{}' directory!".format(target_folder))
 
 
-def load_data(quiet=True):
+def load_data(quiet=True, stream=False):
     find_path_to_helpers(quiet=quiet)
     if __package__:
-        from ..helpers import get_input
+        from ..helpers import get_input_records
     else:
-        from helpers import get_input
+        from helpers import get_input_records
 
-    data = get_input().split("\n\n")
+    # Streamed records are read lazily, but can only be iterated once
+    if stream:
+        return get_input_records()
+
+    data = list(get_input_records())
 
     return data
 
 # %% Part 1
 
+# Each question a-z is one bit of a 26-bit answer mask
+BITS = {chr(ord("a") + i): 1 << i for i in range(26)}
+ALL_ANSWERS = (1 << 26) - 1
 
-def part1(data):
-    blockSums = []
-    bigTotal = 0
+
+def answerMask(line: str) -> int:
+    return reduce(or_, map(BITS.__getitem__, line), 0)
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def countAnswers(data: Iterable[str]) -> Tuple[int, int]:
+    """
+    Totals, over all groups, the questions anyone in the group answered and
+    the questions everyone in the group answered
+    """
+    anyone = everyone = 0
     for block in data:
-        total = 0
-        unique = []
-        for line in block.split("\n"):
-            for c in line:
-                if not c in unique:
-                    total += 1
-                    unique.append(c)
-        bigTotal += total
-        blockSums.append(total)
-    return bigTotal
+        masks = [answerMask(line) for line in block.split("\n")]
+        anyone += popcount(reduce(or_, masks, 0))
+        everyone += popcount(reduce(and_, masks, ALL_ANSWERS))
+    return anyone, everyone
+
+
+def countAnswersNumpy(data: Iterable[str]) -> Tuple[int, int]:
+    """countAnswers, with the per-group OR/AND reductions done by NumPy in one go"""
+    masks: List[int] = []
+    starts: List[int] = []
+    for block in data:
+        starts.append(len(masks))
+        masks.extend(answerMask(line) for line in block.split("\n"))
+    if not starts:
+        return 0, 0
+    masks = np.array(masks, dtype=np.uint32)
+    starts = np.array(starts)
+
+    def total(groups):
+        return int(np.unpackbits(groups.view(np.uint8)).sum())
+
+    return (total(np.bitwise_or.reduceat(masks, starts)),
+            total(np.bitwise_and.reduceat(masks, starts)))
+
+
+def part1(data):
+    return countAnswers(data)[0]
 
 # %% Part 2
 
 
 def part2(data):
-    bigTotal = 0
-    for block in data:
-        lines = block.split("\n")
-        total = 0
-        commonChars = set((x for x in lines[0]))
-        for line in lines:
-            newSet = set((x for x in line))
-            commonChars = commonChars.intersection(newSet)
-        total = len(commonChars)
-        bigTotal += total
-
-    return bigTotal
+    return countAnswers(data)[1]
 
 
 # %% Run all
 if __name__ == "__main__":
-    data = load_data()
+    # Records are streamed, so both parts are counted in the same pass
+    count = countAnswersNumpy if np else countAnswers
+    result1, result2 = count(load_data(stream=True))
 
-    print(part1(data))
-    print(part2(data))
+    print(result1)
+    print(result2)
 
 # %%
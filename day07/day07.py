@@ -11,6 +11,10 @@ Created on 2021-11-22T21:41:02.998399
 # %% Data loading
 
 
+import re
+from typing import Dict, Iterator, List, Set, Tuple
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -63,90 +67,190 @@ def load_data(quiet=True):
 
 # %% Part 1
 
+CHILD_REGEX = re.compile(r"(\d+) (\w+ \w+) bags?")
 
-def accumulateUniqueParents(allBags, searches, unique=[], searched=[]):
-    # If we have no more to search, return unique parents
-    if (len(searches) == 0):
-        return unique
-    # Item to search for
-    toBeSearched = searches.pop()
-    if not toBeSearched in unique:
-        unique.append(toBeSearched)
-    # print(toBeSearched)
-    if not toBeSearched in searched:
-        searched.append(toBeSearched)
-        # find all parents containing this bag
-        parents = []
-        for test in allBags:
-            childrenMatch = list(
-                filter(lambda x: x["bag_name"] == toBeSearched, test["children"]))
-            if (len(childrenMatch) > 0):
-                parents.append(test)
-        for parent in parents:
-            if not parent["bag_name"] in unique:
-                unique.append(parent["bag_name"])
-            if not parent["bag_name"] in searched:
-                searches.append(parent["bag_name"])
-    return accumulateUniqueParents(allBags, searches, unique, searched)
 
+class BagGraph:
+    """
+    Bag rules as a graph over interned bag IDs, with child (contains) and
+    parent (contained by) adjacency built once up front
+    """
 
-def part1(data):
-    bags = []
-    golds = []
-    for line in data:
-        bag_name = " ".join(line.split(" ")[:2])
-        after_contains = line.split("contain ")[1]
-        children = []
-        for bag in after_contains.split(", "):
-            words = bag.split(" ")
-            count = int(words[0]) if words[0].isnumeric() else 0
-            child_type = " ".join(words[1:3])
-            children.append({"bag_name": child_type, "count": count})
-            if child_type == "shiny gold":
-                golds.append(bag_name)
-        bags.append({"bag_name": bag_name, "children": children})
-    unique = accumulateUniqueParents(bags, golds)
-    return len(unique)
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.children: List[Dict[int, int]] = []
+        self.parents: List[Set[int]] = []
+        self._ancestors: Dict[int, Set[int]] = {}
+        self._contained: Dict[int, int] = {}
+
+    @staticmethod
+    def fromRules(lines: List[str]) -> "BagGraph":
+        graph = BagGraph()
+        for line in lines:
+            if not line:
+                continue
+            bag_name, after_contains = line.split(" bags contain ")
+            bag = graph.intern(bag_name)
+            for count, child_name in CHILD_REGEX.findall(after_contains):
+                child = graph.intern(child_name)
+                graph.children[bag][child] = int(count)
+                graph.parents[child].add(bag)
+        return graph
+
+    def intern(self, name: str) -> int:
+        """Returns the ID for a bag name, adding it to the graph if it's new"""
+        bag = self.ids.get(name)
+        if bag is None:
+            bag = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.children.append({})
+            self.parents.append(set())
+        return bag
+
+    def ancestors(self, name: str) -> Set[str]:
+        """All bags that can eventually contain the named bag"""
+        if name not in self.ids:
+            return set()
+        bag = self.ids[name]
+        if bag not in self._ancestors:
+            found = set()
+            stack = [bag]
+            while stack:
+                for parent in self.parents[stack.pop()]:
+                    if parent not in found:
+                        found.add(parent)
+                        stack.append(parent)
+            self._ancestors[bag] = found
+        return {self.names[b] for b in self._ancestors[bag]}
+
+    def totalContained(self, name: str) -> int:
+        """Total number of bags inside the named bag"""
+        if name not in self.ids:
+            return 0
+        contained = self._contained
+        onStack = set()
+        # Iterative post-order DFS: a bag's total is only computed once all
+        # of its children have theirs
+        stack = [self.ids[name]]
+        while stack:
+            bag = stack[-1]
+            if bag in contained:
+                stack.pop()
+                continue
+            pending = [c for c in self.children[bag] if c not in contained]
+            if pending and bag not in onStack:
+                onStack.add(bag)
+                for child in pending:
+                    if child in onStack:
+                        raise ValueError("Bag rules contain a cycle through '{}'".format(
+                            self.names[child]))
+                    stack.append(child)
+                continue
+            if pending:
+                raise ValueError("Bag rules contain a cycle through '{}'".format(
+                    self.names[bag]))
+            contained[bag] = sum(count * (1 + contained[child])
+                                 for child, count in self.children[bag].items())
+            onStack.discard(bag)
+            stack.pop()
+        return contained[self.ids[name]]
+
+    def topologicalOrder(self) -> List[int]:
+        """
+        Bag IDs ordered so every bag comes before the bags it contains
+        (Kahn's algorithm). Raises ValueError if the rules have a cycle.
+        """
+        inDegree = [len(p) for p in self.parents]
+        order = [bag for bag, degree in enumerate(inDegree) if not degree]
+        for bag in order:
+            for child in self.children[bag]:
+                inDegree[child] -= 1
+                if not inDegree[child]:
+                    order.append(child)
+        if len(order) < len(self.names):
+            stuck = [self.names[b] for b, degree in enumerate(inDegree) if degree]
+            raise ValueError("Bag rules contain a cycle involving: {}".format(
+                ", ".join(sorted(stuck))))
+        return order
+
+    def ancestorMasks(self, order: List[int] = None) -> List[int]:
+        """
+        Ancestor sets for every bag as big-int bitsets (bit i set if bag i can
+        eventually contain it), so shared ancestors aren't double counted
+        """
+        if order is None:
+            order = self.topologicalOrder()
+        ancestors = [0] * len(self.names)
+        for bag in order:
+            mask = ancestors[bag] | (1 << bag)
+            for child in self.children[bag]:
+                ancestors[child] |= mask
+        return ancestors
+
+    def report(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Maps every bag to (total bags contained, number of bags that can
+        eventually contain it), computed in one pass over a topological order
+        """
+        order = self.topologicalOrder()
+        contained = [0] * len(self.names)
+        for bag in reversed(order):
+            contained[bag] = sum(count * (1 + contained[child])
+                                 for child, count in self.children[bag].items())
+        ancestors = self.ancestorMasks(order)
+        self._contained.update(enumerate(contained))
+        return {name: (contained[bag], bin(ancestors[bag]).count("1"))
+                for bag, name in enumerate(self.names)}
 
-# %% Part 2
 
+def iterBits(mask: int) -> Iterator[int]:
+    """Indices of the set bits in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
 
-def countChildren(allBags, children, count=0):
-    if len(children) == 0:
-        return count
-    child = children.pop()
-    cCount = child["count"]
-    count += child["count"]
-    # Find this bag in allBags
-    bags = list(filter(lambda x: x["bag_name"] == child["bag_name"], allBags))
-    if (len(bags) > 0):
-        bChildren = bags[0]["children"]
-        childr2 = []
-        for kid in bChildren:
-            kidClone = kid.copy()
-            kidClone["count"] = kid["count"] * cCount
-            children.append(kidClone)
-            childr2.append(kidClone)
-    return countChildren(allBags, children, count)
+
+class ReachabilityIndex:
+    """
+    Transitive closure of a BagGraph, stored as one ancestor bitset per bag.
+    Once built, "can A contain B" is a single bit test and listing the
+    containers of B costs O(popcount).
+    """
+
+    def __init__(self, graph: BagGraph):
+        self.graph = graph
+        self.masks = graph.ancestorMasks()
+
+    def canContain(self, outer: str, inner: str) -> bool:
+        """Whether the outer bag can eventually contain the inner bag"""
+        ids = self.graph.ids
+        if outer not in ids or inner not in ids:
+            return False
+        return bool(self.masks[ids[inner]] >> ids[outer] & 1)
+
+    def containers(self, inner: str) -> List[str]:
+        """All bags that can eventually contain the inner bag"""
+        if inner not in self.graph.ids:
+            return []
+        names = self.graph.names
+        return [names[bag] for bag in iterBits(self.masks[self.graph.ids[inner]])]
+
+    def countContainers(self, inner: str) -> int:
+        if inner not in self.graph.ids:
+            return 0
+        return bin(self.masks[self.graph.ids[inner]]).count("1")
+
+
+def part1(data):
+    return len(BagGraph.fromRules(data).ancestors("shiny gold"))
+
+# %% Part 2
 
 
 def part2(data):
-    bags = []
-    kids = []
-    for line in data:
-        bag_name = " ".join(line.split(" ")[:2])
-        after_contains = line.split("contain ")[1]
-        children = []
-        if (after_contains[0] != "n"):
-            for bag in after_contains.split(", "):
-                words = bag.split(" ")
-                count = int(words[0]) if words[0].isnumeric() else 0
-                child_type = " ".join(words[1:3])
-                children.append({"bag_name": child_type, "count": count})
-        bags.append({"bag_name": bag_name, "children": children})
-        if bag_name == "shiny gold":
-            kids = children
-    return countChildren(bags, kids)
+    return BagGraph.fromRules(data).totalContained("shiny gold")
 
 
 # %% Run all
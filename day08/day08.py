@@ -11,6 +11,10 @@ Created on 2021-11-22T21:41:05.842651
 # %% Data loading
 
 
+from array import array
+from typing import List, Optional, Tuple
+
+
 def find_path_to_helpers(target_folder="helpers", quiet=False):
     # Skip path finding if we successfully import the dummy file
     try:
@@ -63,67 +67,111 @@ def load_data(quiet=True):
 
 # %% Part 1
 
-
-def part1(data):
+ACC, JMP, NOP = range(3)
+OPCODES = {"acc": ACC, "jmp": JMP, "nop": NOP}
+
+
+def compileProgram(data: List[str]) -> Tuple[array, array]:
+    """
+    Decodes the program once into parallel opcode/argument arrays
+    """
+    ops = array("i")
+    args = array("i")
+    for line in data:
+        op, arg = line.split(" ")
+        ops.append(OPCODES[op])
+        args.append(int(arg))
+    return ops, args
+
+
+def run(ops: array, args: array) -> Tuple[bool, int]:
+    """
+    Runs a compiled program until it either leaves the program (terminates)
+    or is about to execute an instruction for a second time (loops).
+    Returns (terminated, accumulator)
+    """
+    n = len(ops)
+    visited = bytearray(n)
     a = 0
     insP = 0
-    run = []
-
-    while True:
-        if insP in run:
-            return a
-        ins = data[insP]
-        run.append(insP)
-        parts = ins.split(" ")
-        op = parts[0]
-
-        if op == "acc":
-            a += int(parts[1])
+    while 0 <= insP < n:
+        if visited[insP]:
+            return False, a
+        visited[insP] = 1
+        op = ops[insP]
+        if op == ACC:
+            a += args[insP]
             insP += 1
-        elif op == "nop":
+        elif op == JMP:
+            insP += args[insP]
+        else:
             insP += 1
-        elif op == "jmp":
-            insP += int(parts[1])
+    return True, a
+
+
+def part1(data):
+    _, a = run(*compileProgram(data))
+    return a
 
 # %% Part 2
 
 
+def reachesEnd(ops: array, args: array) -> bytearray:
+    """
+    Marks every address whose execution leaves the program, found by walking
+    the reverse control-flow graph back from the instructions that exit
+    """
+    n = len(ops)
+    parents = [[] for _ in range(n)]
+    stack = []
+    for i in range(n):
+        nxt = i + args[i] if ops[i] == JMP else i + 1
+        if 0 <= nxt < n:
+            parents[nxt].append(i)
+        else:
+            stack.append(i)
+    ends = bytearray(n)
+    while stack:
+        i = stack.pop()
+        ends[i] = 1
+        stack.extend(parents[i])
+    return ends
+
+
+def repairProgram(ops: array, args: array) -> Optional[Tuple[Optional[int], int]]:
+    """
+    Finds the single jmp/nop flip that makes the program terminate in O(n).
+    Returns (patched address, final accumulator), with an address of None if
+    the program already terminates, or None if no single flip fixes it.
+    """
+    terminated, a = run(ops, args)
+    if terminated:
+        return None, a
+
+    n = len(ops)
+    ends = reachesEnd(ops, args)
+    visited = bytearray(n)
+    insP = 0
+    # Walk the original (looping) path, looking for an instruction whose
+    # flipped successor is on a terminating path
+    while not visited[insP]:
+        visited[insP] = 1
+        op = ops[insP]
+        if op != ACC:
+            flipped = insP + 1 if op == JMP else insP + args[insP]
+            if not 0 <= flipped < n or ends[flipped]:
+                ops[insP] = NOP if op == JMP else JMP
+                _, a = run(ops, args)
+                ops[insP] = op
+                return insP, a
+        insP = insP + args[insP] if op == JMP else insP + 1
+    return None
+
+
 def part2(data):
-    allChangeable = list(filter(lambda x: x[1].startswith(
-        "nop") or x[1].startswith("jmp"), enumerate(data)))
-    iChange = 0
-
-    for iChange in range(-1, len(allChangeable)):
-        # clone data
-        nData = data.copy()
-        # Make change
-        if iChange >= 0:
-            test = allChangeable[iChange]
-            if test[1].startswith("jmp"):
-                nData[test[0]] = " ".join(["nop", test[1].split(" ")[1]])
-            else:
-                nData[test[0]] = " ".join(["jmp", test[1].split(" ")[1]])
-        # set state
-        a = 0
-        insP = 0
-        run = []
-        while insP < len(nData):
-            if insP in run:
-                break
-            ins = nData[insP]
-            run.append(insP)
-            parts = ins.split(" ")
-            op = parts[0]
-
-            if op == "acc":
-                a += int(parts[1])
-                insP += 1
-            elif op == "nop":
-                insP += 1
-            elif op == "jmp":
-                insP += int(parts[1])
-        if insP >= len(nData):
-            return a
+    repair = repairProgram(*compileProgram(data))
+    if repair:
+        return repair[1]
 
 
 # %% Run all
@@ -11,9 +11,9 @@ Created on 2021-11-22T22:49:28.834154
 # %% Data loading
 
 
-from typing import List
-import itertools
-from functools import reduce
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+from collections import Counter, deque
+from itertools import accumulate
 
 
 def find_path_to_helpers(target_folder="helpers", quiet=False):
@@ -70,79 +70,137 @@ def load_data(quiet=True):
 # %% Part 1
 
 
-def checkSum(num: int, allNums: List[int]):
-    for x, y in itertools.combinations(allNums, 2):
-        if x+y == num:
-            return True
-    return False
+class SumWindow:
+    """
+    Sliding window over the last `size` numbers, kept as a multiset so that
+    adding/evicting a number is O(1) and a pair-sum check is O(size)
+    """
+
+    def __init__(self, size: int = 25):
+        if size < 2:
+            raise ValueError("Window size must be at least 2, got {}".format(size))
+        self.size = size
+        self.window = deque()
+        self.counts = Counter()
+
+    def full(self) -> bool:
+        return len(self.window) == self.size
+
+    def push(self, num: int):
+        """Adds num to the window, evicting the oldest number if it's full"""
+        if self.full():
+            old = self.window.popleft()
+            self.counts[old] -= 1
+            if not self.counts[old]:
+                del self.counts[old]
+        self.window.append(num)
+        self.counts[num] += 1
+
+    def hasPair(self, num: int) -> bool:
+        """Checks if two numbers in the window (at different positions) sum to num"""
+        counts = self.counts
+        for x in counts:
+            y = num - x
+            if y in counts and (y != x or counts[x] > 1):
+                return True
+        return False
+
+
+def invalidNumbers(data: Iterable[int], window: int = 25) -> Iterator[Tuple[int, int]]:
+    """
+    Lazily validates a (possibly unbounded) stream of numbers, yielding
+    (offset, num) for every number that isn't the sum of two of the `window`
+    numbers before it. Only the window is held in memory.
+    """
+    nums = SumWindow(window)
+    for offset, num in enumerate(data):
+        if nums.full() and not nums.hasPair(num):
+            yield offset, num
+        nums.push(num)
+
+
+def streamInts(lines: Iterable[str]) -> Iterator[int]:
+    """Lazily parses ints from an iterable of lines, e.g. an open file"""
+    find_path_to_helpers(quiet=True)
+    if __package__:
+        from ..helpers import ints
+    else:
+        from helpers import ints
 
+    for line in lines:
+        yield from ints(line)
 
-def part1(data):
-    WINDOW = 25
-    for offset in range(WINDOW, len(data)):
-        num = data[offset]
-        prevNums = data[offset-WINDOW:offset]
-        if not checkSum(num, prevNums):
-            return num
+
+def part1(data, window: int = 25):
+    for _, num in invalidNumbers(data, window):
+        return num
 
 
 # %% Part 2
 
-# An efficient program
-# to print subarray
-# with sum as given sum
-
-# Returns true if the
-# there is a subarray
-# of arr[] with sum
-# equal to 'sum'
-# otherwise returns
-# false. Also, prints
-# the result.
-def subArraySum(arr: List[int], n, sum_):
-
-    # Initialize curr_sum as
-    # value of first element
-    # and starting point as 0
-    curr_sum = arr[0]
-    start = 0
-
-    # Add elements one by
-    # one to curr_sum and
-    # if the curr_sum exceeds
-    # the sum, then remove
-    # starting element
-    i = 1
-    while i <= n:
-
-        # If curr_sum exceeds
-        # the sum, then remove
-        # the starting elements
-        while curr_sum > sum_ and start < i-1:
-
-            curr_sum = curr_sum - arr[start]
-            start += 1
-
-        # If curr_sum becomes
-        # equal to sum, then
-        # return true
-        if curr_sum == sum_:
-            return arr[start:i-1]
-
-        # Add this element
-        # to curr_sum
-        if i < n:
-            curr_sum = curr_sum + arr[i]
-        i += 1
-
-    return None
-
-
-def part2(data, invalidNum):
-    subArr = subArraySum(data, len(data), invalidNum)
-    if subArr:
-        min_ = reduce(min, subArr)
-        max_ = reduce(max, subArr)
+
+class SparseTable:
+    """
+    Static range min/max structure: O(n log n) to build, O(1) per query
+    """
+
+    def __init__(self, data: Sequence[int]):
+        self.mins = [list(data)]
+        self.maxs = [list(data)]
+        width = 1
+        while 2 * width <= len(data):
+            prevMin, prevMax = self.mins[-1], self.maxs[-1]
+            count = len(prevMin) - width
+            self.mins.append([min(prevMin[i], prevMin[i + width]) for i in range(count)])
+            self.maxs.append([max(prevMax[i], prevMax[i + width]) for i in range(count)])
+            width *= 2
+
+    def minMax(self, start: int, end: int) -> Tuple[int, int]:
+        """Min and max of data[start:end] (non-empty)"""
+        level = (end - start).bit_length() - 1
+        other = end - (1 << level)
+        mins, maxs = self.mins[level], self.maxs[level]
+        return min(mins[start], mins[other]), max(maxs[start], maxs[other])
+
+
+class RangeSumIndex:
+    """
+    Prefix sums plus a hash map of where each prefix sum first occurs, built
+    once so that every "contiguous range summing to X" query is a single
+    linear pass of dict lookups. Works for negative numbers too.
+    """
+
+    def __init__(self, data: Sequence[int]):
+        self.data = data
+        self.prefix = [0, *accumulate(data)]
+        self.firstIndex = {}
+        for i, total in enumerate(self.prefix):
+            self.firstIndex.setdefault(total, i)
+        self._table = None
+
+    def find(self, target: int, minLength: int = 2) -> Optional[Tuple[int, int]]:
+        """
+        Returns (start, end) of the range data[start:end] with the earliest end
+        that sums to target and holds at least minLength numbers, or None
+        """
+        firstIndex = self.firstIndex
+        for end in range(minLength, len(self.prefix)):
+            start = firstIndex.get(self.prefix[end] - target)
+            if start is not None and start <= end - minLength:
+                return start, end
+        return None
+
+    def minMax(self, start: int, end: int) -> Tuple[int, int]:
+        if self._table is None:
+            self._table = SparseTable(self.data)
+        return self._table.minMax(start, end)
+
+
+def part2(data, invalidNum, index: Optional[RangeSumIndex] = None):
+    index = index or RangeSumIndex(data)
+    bounds = index.find(invalidNum)
+    if bounds:
+        min_, max_ = index.minMax(*bounds)
         return min_ + max_
     return -1
 
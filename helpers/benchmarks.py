@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks for the helpers.
+
+Run from the project root with `python helpers/benchmarks.py`
+
+Created on Sun Oct 18 2026
+
+@author: jaredmcgrath
+"""
+
+import inspect
+import os
+import timeit
+
+if __package__:
+    from .utils import get_cfp
+else:
+    from utils import get_cfp
+
+
+def get_cfp_inspect(real: bool = False) -> str:
+    """The old inspect.stack() based get_cfp, for comparison"""
+    for l in inspect.stack()[1:]:
+        caller = l[0].f_code.co_filename
+        if not "utils.py" in caller:
+            p = caller
+            break
+    if real:
+        return os.path.realpath(p)
+    return p
+
+
+def bench_get_cfp(number: int = 2000):
+    for real in (False, True):
+        old = timeit.timeit(lambda: get_cfp_inspect(real=real), number=number)
+        new = timeit.timeit(lambda: get_cfp(real=real), number=number)
+        print("get_cfp(real={}): inspect.stack() {:.2f} us, frame walk {:.2f} us ({:.0f}x faster)".format(
+            real, old / number * 1e6, new / number * 1e6, old / new))
+
+
+if __name__ == "__main__":
+    bench_get_cfp()
@@ -6,12 +6,20 @@ import math
 import functools
 import itertools
 import os
+import sys
 import inspect
+import mmap
 
+from array import array
 from collections import Counter, defaultdict, deque
 from enum import IntEnum, auto
 from typing import Any, Callable, DefaultDict, Deque, Dict, FrozenSet, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple, TypeVar, Union
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def get_cfp(depth = 1, real: bool = False) -> str:
     """Return caller's current file path.
 
@@ -21,18 +29,31 @@ def get_cfp(depth = 1, real: bool = False) -> str:
         real: if True, returns full path, otherwise relative path
             (default: {False})
     """
-    # Find the first caller that isn't from utils.py
-    s = inspect.stack()
-    for l in s:
-        caller = l[0].f_code.co_filename
+    # Find the first caller that isn't from utils.py. Walking frames directly
+    # (unlike inspect.stack()) doesn't read any source files from disk
+    frame = _getframe(depth)
+    p = None
+    while frame is not None:
+        caller = frame.f_code.co_filename
         if not "utils.py" in caller:
             p = caller
             break
+        frame = frame.f_back
     if real:
-        return os.path.realpath(p)
+        return _realpath(p)
     return p
 
-def get_input(filename_or_path: str = 'input.txt') -> str:
+
+# sys._getframe is a CPython implementation detail, so fall back to inspect elsewhere
+_getframe = getattr(sys, '_getframe', None) or (lambda depth=0: inspect.stack()[depth + 1][0])
+
+
+@functools.lru_cache(maxsize=None)
+def _realpath(path: str) -> str:
+    return os.path.realpath(path)
+
+
+def get_input_path(filename_or_path: str = 'input.txt') -> str:
     # First, if this is a valid path to a file, use it as-is
     if os.path.exists(filename_or_path) and os.path.isfile(filename_or_path):
         path = filename_or_path
@@ -43,7 +64,11 @@ def get_input(filename_or_path: str = 'input.txt') -> str:
         path = os.path.join(cfp_dir, filename_or_path)
     else:
         path = os.path.join(os.getcwd(), filename_or_path)
-    with open(path) as f:
+    return path
+
+
+def get_input(filename_or_path: str = 'input.txt') -> str:
+    with open(get_input_path(filename_or_path)) as f:
         return f.read()
 
 
@@ -51,13 +76,126 @@ def get_input_lines(filename_or_path: str = 'input.txt') -> List[str]:
     return get_input(filename_or_path).split('\n')
 
 
-def ints(text: str, sign_prefixes: bool = True) -> Tuple[int, ...]:
-    regex = '([\-+]?\d+)' if sign_prefixes else '(\d+)'
-    return tuple(map(int, re.findall(regex, text)))
+def get_input_buffer(filename_or_path: str = 'input.txt') -> Union[mmap.mmap, bytes]:
+    """ Memory-maps the input file read-only, so it can be parsed (e.g. with bytes regexes, or via memoryview) without reading it all into memory.
+    Empty files can't be mapped, so they give b'' instead.
+    """
+    with open(get_input_path(filename_or_path), 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        # The mapping stays valid after the file is closed
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_buffer_lines(buffer: Union[mmap.mmap, bytes], encoding: Optional[str] = 'utf-8') -> Iterator[Union[str, bytes]]:
+    """ Lazily yields the '\n' separated lines of a buffer, decoded with encoding (or as bytes if encoding is None).
+    Like get_input_lines, '\r\n' line endings are normalized and a trailing newline gives a final empty line.
+    """
+    start = 0
+    while True:
+        end = buffer.find(b'\n', start)
+        line = buffer[start:] if end < 0 else buffer[start:end]
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        yield line.decode(encoding) if encoding else line
+        if end < 0:
+            return
+        start = end + 1
+
+
+def get_input_lines_iter(filename_or_path: str = 'input.txt', encoding: Optional[str] = 'utf-8') -> Iterator[Union[str, bytes]]:
+    """ Lazy version of get_input_lines over a memory-mapped input file. Only one line is copied out of the file at a time. """
+    return iter_buffer_lines(get_input_buffer(filename_or_path), encoding)
 
 
-def floats(text: str) -> Tuple[float, ...]:
-    return tuple(map(float, re.findall('([\-+]?\d*(?:\d|\d\.|\.\d)\d*)', text)))
+RECORD_SEPARATOR = re.compile('\n(?:[ \t]*\n)+')
+
+
+def get_input_records(filename_or_path: str = 'input.txt', chunk_size: int = 1 << 16) -> Iterator[str]:
+    """ Lazily yields the blank-line separated records of an input file, reading it in chunks of chunk_size characters.
+    Line endings are normalized to '\n', and records have no leading or trailing newlines.
+    """
+    # Resolve and open the file now, so the path is relative to the caller rather than to whoever first iterates the records
+    return _iter_records(open(get_input_path(filename_or_path)), chunk_size)
+
+
+def _iter_records(f, chunk_size: int) -> Iterator[str]:
+    with f:
+        buffer = ''
+        for chunk in iter(functools.partial(f.read, chunk_size), ''):
+            buffer += chunk
+            start = 0
+            for match in RECORD_SEPARATOR.finditer(buffer):
+                record = buffer[start:match.start()].strip('\n')
+                if record:
+                    yield record
+                start = match.end()
+            buffer = buffer[start:]
+        record = buffer.strip('\n')
+        if record:
+            yield record
+
+
+# Compiled once, in str and bytes flavours so mmap/bytes buffers can be parsed without decoding
+INT_PATTERNS = {
+    (str, True): re.compile(r'([\-+]?\d+)'),
+    (str, False): re.compile(r'(\d+)'),
+    (bytes, True): re.compile(rb'([\-+]?\d+)'),
+    (bytes, False): re.compile(rb'(\d+)'),
+}
+FLOAT_PATTERNS = {
+    str: re.compile(r'([\-+]?\d*(?:\d|\d\.|\.\d)\d*)'),
+    bytes: re.compile(rb'([\-+]?\d*(?:\d|\d\.|\.\d)\d*)'),
+}
+
+Text = Union[str, bytes, bytearray, mmap.mmap]
+
+
+def ints(text: Text, sign_prefixes: bool = True) -> Tuple[int, ...]:
+    return tuple(map(int, _int_pattern(text, sign_prefixes).findall(text)))
+
+
+def iter_ints(text: Text, sign_prefixes: bool = True) -> Iterator[int]:
+    """ Lazy version of ints, for streaming over large inputs """
+    return (int(m.group()) for m in _int_pattern(text, sign_prefixes).finditer(text))
+
+
+def ints_array(text: Text, sign_prefixes: bool = True, use_numpy: bool = False) -> Union[array, 'np.ndarray', Tuple[int, ...]]:
+    """ Like ints, but packs the result into an array('q') (or a NumPy int64 array with use_numpy) rather than a tuple of Python ints.
+    If any value doesn't fit in 64 bits, falls back to the tuple returned by ints.
+    """
+    found = _int_pattern(text, sign_prefixes).findall(text)
+    try:
+        if use_numpy and np is not None:
+            return np.array(found).astype(np.int64) if found else np.zeros(0, dtype=np.int64)
+        return array('q', map(int, found))
+    except OverflowError:
+        return tuple(map(int, found))
+
+
+def floats(text: Text) -> Tuple[float, ...]:
+    return tuple(map(float, _float_pattern(text).findall(text)))
+
+
+def iter_floats(text: Text) -> Iterator[float]:
+    """ Lazy version of floats, for streaming over large inputs """
+    return (float(m.group()) for m in _float_pattern(text).finditer(text))
+
+
+def floats_array(text: Text, use_numpy: bool = False) -> Union[array, 'np.ndarray']:
+    """ Like floats, but packs the result into an array('d') (or a NumPy float64 array with use_numpy) """
+    found = _float_pattern(text).findall(text)
+    if use_numpy and np is not None:
+        return np.array(found).astype(np.float64) if found else np.zeros(0, dtype=np.float64)
+    return array('d', map(float, found))
+
+
+def _int_pattern(text: Text, sign_prefixes: bool) -> 're.Pattern':
+    return INT_PATTERNS[str if isinstance(text, str) else bytes, sign_prefixes]
+
+
+def _float_pattern(text: Text) -> 're.Pattern':
+    return FLOAT_PATTERNS[str if isinstance(text, str) else bytes]
 
 
 def sum_iter(x: Iterable[int], y: Iterable[int], s: int = 1) -> Tuple[int, ...]:
@@ -245,11 +383,19 @@ class Grid:
 
     def permutations(self) -> Iterator['Grid']:
         """ Iterates through all permutations (rotations and mirrors) of this grid """
-        grid = self
-        for _ in range(4):
-            yield grid
-            yield grid.mirror_y()
-            grid = grid.rotate_cw()
+        yield self
+        views = self.view().permutations()
+        next(views)
+        for view in views:
+            yield view.materialize()
+
+    def view(self) -> 'GridView':
+        """ A zero-copy view of this grid, which can be rotated and mirrored without copying """
+        return GridView(self)
+
+    def permutation_views(self) -> Iterator['GridView']:
+        """ Like permutations, but yields zero-copy views instead of new grids """
+        return self.view().permutations()
 
     def count(self, value: str) -> int:
         """ Counts the number of occurrences of value within the grid """
@@ -306,6 +452,440 @@ class Grid:
         return '\n'.join(''.join(row) for row in self.grid)
 
 
+class GridView:
+    """ A read-only view of a Grid (or ByteGrid) under one of the 8 rotations / mirrors, without copying any cells.
+    Each view maps its (x, y) to a location in the underlying grid with an affine map: (x0 + xx * x + xy * y, y0 + yx * x + yy * y).
+    Transforming a view composes the maps, so chains of rotations and mirrors never touch the underlying storage.
+    """
+
+    def __init__(self, grid: Union['Grid', 'ByteGrid'], mapping: Tuple[int, int, int, int, int, int] = (0, 1, 0, 0, 0, 1)):
+        self.grid = grid
+        self.mapping = mapping
+        x0, xx, xy, y0, yx, yy = mapping
+        # An axis swap exchanges the width and height
+        self.width, self.height = (grid.height, grid.width) if xx == 0 else (grid.width, grid.height)
+        self.square = self.width == self.height
+        self.default_value = grid.default_value
+
+    def source(self, x: int, y: int) -> Tuple[int, int]:
+        """ The location in the underlying grid that (x, y) in this view maps to """
+        x0, xx, xy, y0, yx, yy = self.mapping
+        return x0 + xx * x + xy * y, y0 + yx * x + yy * y
+
+    def _transform(self, x0: int, xx: int, xy: int, y0: int, yx: int, yy: int) -> 'GridView':
+        # Compose: the new view's (x, y) maps to (x0 + xx * x + xy * y, ...) in this view, then through this view's map
+        a0, ax, ay, b0, bx, by = self.mapping
+        return GridView(self.grid, (
+            a0 + ax * x0 + ay * y0, ax * xx + ay * yx, ax * xy + ay * yy,
+            b0 + bx * x0 + by * y0, bx * xx + by * yx, bx * xy + by * yy))
+
+    def rotate_cw(self) -> 'GridView':
+        """ A view of this view, rotated clockwise """
+        return self._transform(0, 0, 1, self.height - 1, -1, 0)
+
+    def rotate_ccw(self) -> 'GridView':
+        """ A view of this view, rotated counter clockwise """
+        return self._transform(self.width - 1, 0, -1, 0, 1, 0)
+
+    def mirror_y(self) -> 'GridView':
+        """ A view of this view, mirrored over the y-axis """
+        return self._transform(self.width - 1, -1, 0, 0, 0, 1)
+
+    def mirror_x(self) -> 'GridView':
+        """ A view of this view, mirrored over the x-axis """
+        return self._transform(0, 1, 0, self.height - 1, 0, -1)
+
+    def permutations(self) -> Iterator['GridView']:
+        """ Iterates through all permutations (rotations and mirrors) of this view, in the same order as Grid.permutations """
+        view = self
+        for _ in range(4):
+            yield view
+            yield view.mirror_y()
+            view = view.rotate_cw()
+
+    def _line(self, x: int, y: int, dx: int, dy: int, length: int) -> str:
+        grid = self.grid
+        sx, sy = self.source(x, y)
+        x0, xx, xy, y0, yx, yy = self.mapping
+        step_x, step_y = xx * dx + xy * dy, yx * dx + yy * dy
+        return ''.join(grid[sx + i * step_x, sy + i * step_y] for i in range(length))
+
+    def top(self) -> str:
+        return self._line(0, 0, 1, 0, self.width)
+
+    def bottom(self) -> str:
+        return self._line(0, self.height - 1, 1, 0, self.width)
+
+    def left(self) -> str:
+        return self._line(0, 0, 0, 1, self.height)
+
+    def right(self) -> str:
+        return self._line(self.width - 1, 0, 0, 1, self.height)
+
+    def edges(self) -> Tuple[str, str, str, str]:
+        """ The (top, right, bottom, left) edges of this view, each read left to right / top to bottom """
+        return self.top(), self.right(), self.bottom(), self.left()
+
+    def materialize(self) -> 'Grid':
+        """ Copies this view out into a new Grid """
+        return Grid([list(self._line(0, y, 1, 0, self.width)) for y in range(self.height)], self.default_value)
+
+    def count(self, value: str) -> int:
+        """ Counts the number of occurrences of value within the view (the same as in the underlying grid) """
+        return self.grid.count(value)
+
+    def locations(self) -> Iterator[Tuple[int, int]]:
+        """ An iterator over all coordinate positions within the view """
+        for x in range(self.width):
+            for y in range(self.height):
+                yield x, y
+
+    def __getitem__(self, item: Tuple[int, int]) -> str:
+        if isinstance(item, tuple) and len(item) == 2 and isinstance(item[0], int) and isinstance(item[1], int):
+            if 0 <= item[0] < self.width and 0 <= item[1] < self.height:
+                return self.grid[self.source(*item)]
+            elif self.default_value is not None:
+                return self.default_value
+            else:
+                raise ValueError('Provided location is out of bounds: %s not in [0, %d) x [0, %d)' % (
+                    str(item), self.width, self.height))
+        else:
+            raise TypeError(
+                'Provided index is not an (x, y) tuple: %s' % str(item))
+
+    def __contains__(self, item: Tuple[int, int]) -> bool:
+        return isinstance(item, tuple) and len(item) == 2 and 0 <= item[0] < self.width and 0 <= item[1] < self.height
+
+    def __str__(self) -> str:
+        return '\n'.join(self._line(0, y, 1, 0, self.width) for y in range(self.height))
+
+
+class ByteGrid:
+    """ A Grid of single-byte cells, stored row-major in one flat bytearray (or as a NumPy uint8 array via as_numpy()).
+    Supports the same (x, y) indexing as Grid, plus unchecked get/set accessors returning the raw byte values, for inner loops.
+    """
+
+    @staticmethod
+    def from_text(text: Text, default_value: Optional[str] = None) -> 'ByteGrid':
+        """ Builds a grid straight from an input buffer (str, bytes or mmap). Every row must be the same width. """
+        if isinstance(text, str):
+            text = text.encode()
+        rows = bytes(text).strip().split(b'\n')
+        rows = [row.rstrip(b'\r') for row in rows]
+        width = len(rows[0])
+        if any(len(row) != width for row in rows):
+            raise ValueError('ByteGrid rows must all be the same width (%d)' % width)
+        return ByteGrid(bytearray(b''.join(rows)), width, len(rows), default_value)
+
+    @staticmethod
+    def from_lines(lines: List[str], default_value: Optional[str] = None) -> 'ByteGrid':
+        return ByteGrid.from_text('\n'.join(lines), default_value)
+
+    @staticmethod
+    def from_grid(grid: 'Grid') -> 'ByteGrid':
+        return ByteGrid.from_text(str(grid), grid.default_value)
+
+    def __init__(self, data: bytearray, width: int, height: int, default_value: Optional[str] = None):
+        if len(data) != width * height:
+            raise ValueError('ByteGrid data has %d cells, expected %d x %d' % (len(data), width, height))
+        self.data = data
+        self.width = width
+        self.height = height
+        self.square = width == height
+        self.default_value = default_value
+
+    def copy(self) -> 'ByteGrid':
+        """ Creates an identical copy of this grid """
+        return ByteGrid(bytearray(self.data), self.width, self.height, self.default_value)
+
+    def to_grid(self) -> 'Grid':
+        return Grid.from_text(str(self), self.default_value)
+
+    def view(self) -> 'GridView':
+        """ A zero-copy view of this grid, which can be rotated and mirrored without copying """
+        return GridView(self)
+
+    def as_numpy(self) -> 'np.ndarray':
+        """ A (height, width) uint8 NumPy view of the cells. Writes to it go straight to this grid. """
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, self.width)
+
+    def get(self, x: int, y: int) -> int:
+        """ Unchecked fast accessor, returning the raw byte at (x, y) """
+        return self.data[y * self.width + x]
+
+    def set(self, x: int, y: int, value: int):
+        """ Unchecked fast setter, taking a raw byte value """
+        self.data[y * self.width + x] = value
+
+    def row(self, y: int) -> bytes:
+        return bytes(self.data[y * self.width:(y + 1) * self.width])
+
+    def count(self, value: str) -> int:
+        """ Counts the number of occurrences of value within the grid. Like Grid, only single cell values can match. """
+        value = value.encode()
+        return self.data.count(value) if len(value) == 1 else 0
+
+    def locations(self) -> Iterator[Tuple[int, int]]:
+        """ An iterator over all coordinate positions within the grid """
+        for x in range(self.width):
+            for y in range(self.height):
+                yield x, y
+
+    def _index(self, item: Tuple[int, int]) -> Optional[int]:
+        try:
+            x, y = item
+            inside = 0 <= x < self.width and 0 <= y < self.height
+        except (TypeError, ValueError):
+            raise TypeError('Provided index is not an (x, y) tuple: %s' % str(item))
+        if inside:
+            return y * self.width + x
+        if self.default_value is None:
+            raise ValueError('Provided location is out of bounds: %s not in [0, %d) x [0, %d)' % (
+                str(item), self.width, self.height))
+        return None
+
+    def __getitem__(self, item: Tuple[int, int]) -> str:
+        i = self._index(item)
+        return self.default_value if i is None else chr(self.data[i])
+
+    def __setitem__(self, key: Tuple[int, int], value: str):
+        i = self._index(key)
+        if i is not None:
+            self.data[i] = ord(value)
+
+    def __contains__(self, item: Union[Tuple[int, int], str]) -> bool:
+        if isinstance(item, str):
+            value = item.encode()
+            return len(value) == 1 and value in self.data
+        try:
+            x, y = item
+            return 0 <= x < self.width and 0 <= y < self.height
+        except (TypeError, ValueError):
+            raise TypeError(
+                'Provided item is not a key (x, y) pair, or value (str): %s' % str(item))
+
+    def __eq__(self, other: Optional['ByteGrid']) -> bool:
+        return other is not None and self.width == other.width and self.data == other.data
+
+    def __str__(self) -> str:
+        return '\n'.join(self.row(y).decode() for y in range(self.height))
+
+
+class AutomatonRule:
+    """ A Life-like rule: a dead cell with a neighbour count in birth comes alive, and a live cell stays alive if its count is in survive.
+    Cells that are neither the alive nor dead value (e.g. floor) never change. With line_of_sight, a cell's neighbours are the first
+    non-static cell seen in each of the 8 directions, rather than the 8 adjacent cells.
+    """
+
+    def __init__(self, birth: Iterable[int], survive: Iterable[int], alive: str = '#', dead: str = '.', line_of_sight: bool = False):
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        self.alive = alive
+        self.dead = dead
+        self.line_of_sight = line_of_sight
+
+
+class GridAutomaton:
+    """ Steps a Grid (or ByteGrid) under an AutomatonRule, holding the board as NumPy arrays and computing each generation with
+    shifted-array sums (adjacent mode) or a precomputed neighbour table (line of sight mode). Requires NumPy.
+    Line of sight mode is bound by gathering 8 neighbour states per cell each generation, so it is roughly an order of magnitude
+    slower than adjacent mode: tens of generations per second on a 1000x1000 board, rather than hundreds.
+    """
+
+    DIRECTIONS = tuple((dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy)
+
+    def __init__(self, grid: Union['Grid', 'ByteGrid'], rule: AutomatonRule):
+        if np is None:
+            raise ImportError('GridAutomaton requires numpy')
+        self.rule = rule
+        self.default_value = grid.default_value
+        self.board = ByteGrid.from_text(str(grid), grid.default_value).as_numpy().copy()
+        self.alive = self.board == ord(rule.alive)
+        self.cells = self.alive | (self.board == ord(rule.dead))
+        # Lookup table from (neighbour count + 9 if alive) to next state
+        self.next_state = np.array([n in rule.birth for n in range(9)] + [n in rule.survive for n in range(9)])
+        self.generation = 0
+        self._cell_index = np.flatnonzero(self.cells).astype(np.int32)
+        self._neighbours = self._visible_neighbours() if rule.line_of_sight else None
+
+    def _visible_neighbours(self) -> 'np.ndarray':
+        """ For each direction, the flat index of the first cell visible from each location (or an extra index that's never alive) """
+        h, w = self.cells.shape
+        none = h * w
+        index = np.arange(h * w, dtype=np.int32).reshape(h, w)
+        table = np.full((len(self.DIRECTIONS), h, w), none, dtype=np.int32)
+        for d, (dx, dy) in enumerate(self.DIRECTIONS):
+            nearest = table[d]
+            # Sweep so that the neighbour in direction (dx, dy) is always resolved before the cell itself
+            lines = range(h - 1, -1, -1) if dy > 0 else range(h) if dy < 0 else range(w - 1, -1, -1) if dx > 0 else range(w)
+            for i in lines:
+                if dy:
+                    y, ny = i, i + dy
+                    if not 0 <= ny < h:
+                        continue
+                    xs = np.arange(max(0, -dx), min(w, w - dx))
+                    nxs = xs + dx
+                    nearest[y, xs] = np.where(self.cells[ny, nxs], index[ny, nxs], nearest[ny, nxs])
+                else:
+                    x, nx = i, i + dx
+                    if not 0 <= nx < w:
+                        continue
+                    nearest[:, x] = np.where(self.cells[:, nx], index[:, nx], nearest[:, nx])
+        # Only non-static cells ever need counting
+        return table.reshape(len(self.DIRECTIONS), -1)[:, self._cell_index]
+
+    def neighbour_counts(self) -> 'np.ndarray':
+        """ Number of live neighbours of every location """
+        alive = self.alive.view(np.uint8)
+        if self._neighbours is not None:
+            flat = np.concatenate((alive.ravel(), np.zeros(1, dtype=np.uint8)))
+            cell_counts = np.zeros(len(self._cell_index), dtype=np.uint8)
+            for direction in self._neighbours:
+                cell_counts += np.take(flat, direction)
+            counts = np.zeros(alive.size, dtype=np.uint8)
+            counts[self._cell_index] = cell_counts
+            return counts.reshape(alive.shape)
+        # 3x3 box sum as a row pass then a column pass, minus the centre cell
+        padded = np.pad(alive, 1)
+        rows = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+        return rows[:-2] + rows[1:-1] + rows[2:] - alive
+
+    def step(self) -> bool:
+        """ Advances one generation, returning True if anything changed """
+        counts = self.neighbour_counts()
+        counts += self.alive.view(np.uint8) * np.uint8(9)
+        alive = np.take(self.next_state, counts) & self.cells
+        changed = not np.array_equal(alive, self.alive)
+        self.alive = alive
+        self.generation += 1
+        return changed
+
+    def run(self, steps: Optional[int] = None) -> int:
+        """ Steps until a fixed point is reached (or after steps generations), returning the number of generations run """
+        start = self.generation
+        while steps is None or self.generation - start < steps:
+            if not self.step():
+                break
+        return self.generation - start
+
+    def count_alive(self) -> int:
+        return int(self.alive.sum())
+
+    def to_grid(self) -> 'Grid':
+        board = np.where(self.cells, np.where(self.alive, ord(self.rule.alive), ord(self.rule.dead)), self.board).astype(np.uint8)
+        return ByteGrid(bytearray(board.tobytes()), board.shape[1], board.shape[0], self.default_value).to_grid()
+
+
+class SparseAutomaton:
+    """ A Life-like automaton on an unbounded grid of any dimension, storing only the active cells.
+    Each point is packed into one int key (a fixed number of bits per coordinate, offset by half that range), so the key of a neighbour is
+    just key + a precomputed offset. Neighbour counts for all active cells are then computed in one batch, with a Counter or, with use_numpy,
+    np.unique over int64 keys (which shrinks each coordinate to 63 // dims bits).
+    """
+
+    BITS = 21
+
+    def __init__(self, active: Iterable[Tuple[int, ...]], dims: int, birth: Iterable[int] = (3,), survive: Iterable[int] = (2, 3), use_numpy: bool = False):
+        self.dims = dims
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        self.use_numpy = use_numpy and np is not None
+        self.bits = min(self.BITS, 63 // dims) if self.use_numpy else self.BITS
+        self.bias = 1 << (self.bits - 1)
+        self.offsets = tuple(self.pack(dp) - self.pack((0,) * dims)
+                             for dp in itertools.product((-1, 0, 1), repeat=dims) if any(dp))
+        self.active = set(map(self.pack, active))
+        self.generation = 0
+
+    @staticmethod
+    def from_grid(grid: Union['Grid', 'ByteGrid'], dims: int = 3, alive: str = '#', **kwargs) -> 'SparseAutomaton':
+        """ Embeds the alive cells of a 2D grid into the z = w = ... = 0 plane """
+        pad = (0,) * (dims - 2)
+        return SparseAutomaton(((x, y) + pad for x, y in grid.locations() if grid[x, y] == alive), dims, **kwargs)
+
+    def pack(self, p: Tuple[int, ...]) -> int:
+        if len(p) != self.dims:
+            raise ValueError('Expected a %d-dimensional point, got %s' % (self.dims, str(p)))
+        key = 0
+        for i, c in enumerate(p):
+            if not -self.bias <= c < self.bias:
+                raise ValueError('Coordinate %d out of packable range [%d, %d)' % (c, -self.bias, self.bias))
+            key |= (c + self.bias) << (i * self.bits)
+        return key
+
+    def unpack(self, key: int) -> Tuple[int, ...]:
+        mask = (1 << self.bits) - 1
+        return tuple(((key >> (i * self.bits)) & mask) - self.bias for i in range(self.dims))
+
+    def neighbour_counts(self) -> Counter:
+        """ Number of active neighbours, for every point with at least one """
+        counts = Counter()
+        active = self.active
+        for offset in self.offsets:
+            counts.update(map(offset.__add__, active))
+        return counts
+
+    def check_bounds(self):
+        """ Raises ValueError if a neighbour of an active cell would fall outside the packable range, where its key would silently
+        carry into the next coordinate
+        """
+        if not self.active:
+            return
+        mask = (1 << self.bits) - 1
+        keys = np.fromiter(self.active, dtype=np.int64, count=len(self.active)) if self.use_numpy else self.active
+        for i in range(self.dims):
+            shift = i * self.bits
+            if self.use_numpy:
+                fields = (keys >> shift) & mask
+                low, high = int(fields.min()), int(fields.max())
+            else:
+                fields = [(key >> shift) & mask for key in keys]
+                low, high = min(fields), max(fields)
+            if low < 1 or high > mask - 1:
+                raise ValueError('Active cells have grown past the packable range [%d, %d) in dimension %d' % (
+                    -self.bias, self.bias, i))
+
+    def step(self):
+        """ Advances one generation """
+        self.check_bounds()
+        if self.use_numpy:
+            self._step_numpy()
+        else:
+            active, birth, survive = self.active, self.birth, self.survive
+            self.active = {key for key, n in self.neighbour_counts().items()
+                           if n in (survive if key in active else birth)}
+            # Active cells with no active neighbours never appear in the counts
+            if 0 in survive:
+                self.active |= {key for key in active if all(key + o not in active for o in self.offsets)}
+        self.generation += 1
+
+    def _step_numpy(self):
+        keys = np.fromiter(self.active, dtype=np.int64, count=len(self.active))
+        offsets = np.array(self.offsets, dtype=np.int64)
+        neighbours, counts = np.unique((keys[:, None] + offsets[None, :]).ravel(), return_counts=True)
+        was_active = np.isin(neighbours, keys)
+        rule = np.where(was_active, np.isin(counts, list(self.survive)), np.isin(counts, list(self.birth)))
+        self.active = set(neighbours[rule].tolist())
+        if 0 in self.survive:
+            self.active |= set(keys[~np.isin(keys, neighbours)].tolist())
+
+    def run(self, steps: int) -> int:
+        """ Runs steps generations, returning the number of active cells at the end """
+        for _ in range(steps):
+            self.step()
+        return len(self.active)
+
+    def cells(self) -> Iterator[Tuple[int, ...]]:
+        """ The active points, as coordinate tuples """
+        return map(self.unpack, self.active)
+
+    def __contains__(self, p: Tuple[int, ...]) -> bool:
+        return self.pack(p) in self.active
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+
 class Production(IntEnum):
     LITERAL = auto()
     SEQUENCE = auto()